@@ -10,19 +10,36 @@ Date: April 2025
 """
 
 import os
-import pandas as pd
-from datetime import datetime
+import atexit
+import functools
+import glob
+import importlib.util
+import json
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import logging
-from pathlib import Path
+import logging.handlers
 import sys
 
-# Set up logging
+# pandas, numpy and the Excel engines are imported inside the functions that use
+# them, so startup and early failures (e.g. a missing raw directory) stay fast
+
+# Set up logging; file writes happen on a background thread via a queue
+_log_queue = queue.Queue(-1)
+# Records arrive already formatted by the QueueHandler, so no formatter is set here
+_file_handler = logging.FileHandler('invoice_processor.log', encoding='utf-8')
+_log_listener = logging.handlers.QueueListener(_log_queue, _file_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler('invoice_processor.log', encoding='utf-8')
+        logging.handlers.QueueHandler(_log_queue)
     ]
 )
 logger = logging.getLogger("invoice_processor")
@@ -42,9 +59,386 @@ class Colors:
 
 
 # Constants for configuration
-REQUIRED_CONTRACTS = [1111, 2222]
-EXCLUDED_LINE_DESCRIPTIONS = ["MSG Chart Expense", "MSG Misc Chart Expense"]
+REQUIRED_CONTRACTS = frozenset({1111, 2222})
+EXCLUDED_LINE_DESCRIPTIONS = frozenset({"MSG Chart Expense", "MSG Misc Chart Expense"})
+# Declared up front so read_excel skips inference; categoricals make filters compare integer codes.
+# Contract is left untyped: stray text such as "TBD" must be filtered out, not fail the read.
+INVOICE_DTYPES = {
+    'Source': 'category',
+    'Line Descr': 'category',
+    'Invoice': 'string'
+}
+# Raw columns the processing steps read; everything else is only needed for REPORT_COLUMNS
+PROCESSING_COLUMNS = ['Journal Date', 'Source', 'Contract', 'Line Descr', 'Invoice', 'Amount', 'AP Amount']
+LABEL_CATEGORIES = [
+    "Charts & Coding",
+    "Misc. exp.",
+    "1111 Coupa Reversal",
+    "1111 Coupa Pending",
+    "2222 Coupa Reversal",
+    "2222 Coupa Pending",
+    "Unlabeled"
+]
+# Codes the Numba kernel writes, looked up so they always follow LABEL_CATEGORIES
+LABEL_CODE_CHARTS = LABEL_CATEGORIES.index("Charts & Coding")
+LABEL_CODE_MISC = LABEL_CATEGORIES.index("Misc. exp.")
+LABEL_CODE_1111_REVERSAL = LABEL_CATEGORIES.index("1111 Coupa Reversal")
+LABEL_CODE_1111_PENDING = LABEL_CATEGORIES.index("1111 Coupa Pending")
+LABEL_CODE_2222_REVERSAL = LABEL_CATEGORIES.index("2222 Coupa Reversal")
+LABEL_CODE_2222_PENDING = LABEL_CATEGORIES.index("2222 Coupa Pending")
+LABEL_CODE_UNLABELED = LABEL_CATEGORIES.index("Unlabeled")
+# Columns written to the "Full Data" sheet; run-constant query fields are left out
+REPORT_COLUMNS = [
+    'Journal ID', 'Source', 'Journal Date', 'Contract', 'Product', 'Project',
+    'Amount', 'Line Descr', 'Supplier', 'Voucher', 'Invoice', 'AP Amount',
+    'Invoice Date', 'User Name', 'PO_ID', 'Coupa PO Line', 'Label', 'Value Used'
+]
+# Source index used by the labeling code; anything else (including blanks) is SOURCE_OTHER
+SOURCE_AP2, SOURCE_COR, SOURCE_OTHER = 0, 1, 2
 OUTLIER_PERCENTILE = 0.99
+NUMBA_LABEL_MIN_ROWS = 1_000_000  # Below this, JIT warmup costs more than it saves
+CACHE_DIR_NAME = ".cache"
+LATEST_MARKER_NAME = ".latest_raw_file"
+RUN_STATE_NAME = ".last_run.json"
+MAX_COLUMN_WIDTH = 50
+WIDTH_SAMPLE_SIZE = 1024
+EXCEL_EPOCH = datetime(1899, 12, 30)  # Day zero of Excel's 1900 date system
+EXCEL_DATE_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+
+# xlsxwriter format properties for each output workbook; Format objects are
+# bound to a workbook, so each save builds its own from these specs
+MMP_FORMAT_SPECS = {
+    'header': {
+        'bold': True,
+        'fg_color': '#E6E6FA',  # Pastel lavender
+        'align': 'center',
+        'border': 1
+    },
+    'percent': {'num_format': '0.00%', 'align': 'center'},
+    'currency': {'num_format': '$#,##0', 'align': 'right'},
+    # Highlight fills only; number formats come from the column formats
+    'gray': {'bg_color': '#D9D9D9'},
+    'yellow': {'bg_color': '#FFFACD'}  # Pastel yellow
+}
+REPORT_FORMAT_SPECS = {
+    'summary_header': {
+        'bold': True,
+        'fg_color': '#FFD1DC',  # Pastel pink
+        'align': 'center',
+        'border': 1
+    },
+    'data_header': {
+        'bold': True,
+        'fg_color': '#CCFFCC',  # Pastel green
+        'align': 'center',
+        'border': 1
+    },
+    'flags_header': {
+        'bold': True,
+        'fg_color': '#FFFFCC',  # Pastel yellow
+        'align': 'center',
+        'border': 1
+    },
+    'currency': {'num_format': '$#,##0.00'}
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _pandas_version():
+    """
+    Get the installed pandas version, for features that need a minimum release.
+
+    Returns:
+        tuple: (major, minor) version numbers
+    """
+    import pandas as pd
+
+    return tuple(int(part) for part in pd.__version__.split('.')[:2])
+
+
+@functools.lru_cache(maxsize=None)
+def _excel_read_engine():
+    """
+    Choose the read_excel engine, preferring the Rust-based calamine reader.
+
+    Returns:
+        str: 'calamine' when python-calamine is installed and pandas >= 2.2,
+        otherwise None for the pandas default (openpyxl)
+    """
+    if importlib.util.find_spec('python_calamine') is not None and _pandas_version() >= (2, 2):
+        return 'calamine'
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _use_arrow_backend():
+    """
+    Decide whether to keep the invoice table's untyped columns in Arrow arrays.
+
+    Returns:
+        bool: True when pyarrow is installed and pandas >= 2.0 (dtype_backend support)
+    """
+    return importlib.util.find_spec('pyarrow') is not None and _pandas_version() >= (2, 0)
+
+
+def _remove_stale_caches(cache_dir, stem):
+    """
+    Delete the Parquet caches previously written for a source file.
+
+    Only files of the exact {stem}_<mtime_ns>_<size>[_all].parquet shape match,
+    so other files whose names merely start with the same stem are kept.
+
+    Args:
+        cache_dir (str): Directory holding the caches
+        stem (str): File name stem of the source file
+    """
+    from pathlib import Path
+
+    own_cache = re.compile(re.escape(stem) + r"_\d+_\d+(?:_all)?\.parquet")
+    for stale in Path(cache_dir).glob(f"{glob.escape(stem)}_*.parquet"):
+        if own_cache.fullmatch(stale.name):
+            stale.unlink()
+
+
+def _write_json_atomic(path, data):
+    """
+    Write JSON to a file via a temporary file, so readers never see a partial write.
+
+    Args:
+        path (str): Destination file path
+        data (dict): JSON-serializable data
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+@functools.lru_cache(maxsize=None)
+def _label_code_table():
+    """
+    Build the lookup from invoice keys to LABEL_CATEGORIES codes.
+
+    The key is (source * 3 + contract) * 3 + sign, where source is a SOURCE_*
+    index, contract is 0 for 1111, 1 for 2222 and 2 otherwise, and sign is
+    0 for negative, 1 for zero or missing and 2 for positive amounts.
+
+    Returns:
+        ndarray: Read-only int8 array of 27 category codes
+    """
+    import numpy as np
+
+    code = LABEL_CATEGORIES.index
+    table = np.full((3, 3, 3), code("Unlabeled"), dtype=np.int8)
+    table[SOURCE_AP2, 0, :] = code("Charts & Coding")
+    table[SOURCE_AP2, 1, :] = code("Misc. exp.")
+    table[SOURCE_COR, 0, 0] = code("1111 Coupa Reversal")
+    table[SOURCE_COR, 0, 2] = code("1111 Coupa Pending")
+    table[SOURCE_COR, 1, 0] = code("2222 Coupa Reversal")
+    table[SOURCE_COR, 1, 2] = code("2222 Coupa Pending")
+
+    table = table.ravel()
+    table.setflags(write=False)
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def _get_label_kernel():
+    """
+    Compile the Numba labeling kernel on first use.
+
+    Numba is optional and only used to label very large invoice tables.
+
+    Returns:
+        function: The kernel, or None if numba is not installed
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    # Not cache=True: Numba cannot reload cached functions defined in a closure
+    @njit(parallel=True)
+    def _label_kernel(src_idx, con, amt, out):
+        """Write a LABEL_CATEGORIES code for every row in one fused pass."""
+        for i in prange(src_idx.size):
+            s = src_idx[i]
+            c = con[i]
+            a = amt[i]
+            if s == SOURCE_AP2 and c == 1111:
+                out[i] = LABEL_CODE_CHARTS
+            elif s == SOURCE_AP2 and c == 2222:
+                out[i] = LABEL_CODE_MISC
+            elif s == SOURCE_COR and c == 1111 and a < 0:
+                out[i] = LABEL_CODE_1111_REVERSAL
+            elif s == SOURCE_COR and c == 1111 and a > 0:
+                out[i] = LABEL_CODE_1111_PENDING
+            elif s == SOURCE_COR and c == 2222 and a < 0:
+                out[i] = LABEL_CODE_2222_REVERSAL
+            elif s == SOURCE_COR and c == 2222 and a > 0:
+                out[i] = LABEL_CODE_2222_PENDING
+            else:
+                out[i] = LABEL_CODE_UNLABELED
+
+    return _label_kernel
+
+
+@functools.lru_cache(maxsize=None)
+def _load_mmp_reference(mmp_ref_path, mtime_ns, size):
+    """
+    Load the MMP reference table, cached per file modification time and size.
+
+    Across runs the table is also kept in a Parquet sidecar next to the Excel
+    file. The sidecar name carries the exact modification time and size, so a
+    replaced file is always decoded again, even if it carries an older mtime.
+
+    Args:
+        mmp_ref_path (str): Path to MMP reclass reference Excel file
+        mtime_ns (int): Modification time of the file in nanoseconds, part of the cache key
+        size (int): Size of the file in bytes, part of the cache key
+
+    Returns:
+        DataFrame: The reference table (callers must copy before modifying)
+    """
+    from pathlib import Path
+    import pandas as pd
+
+    ref_dir = os.path.dirname(mmp_ref_path)
+    stem = Path(mmp_ref_path).stem
+    sidecar_path = os.path.join(ref_dir, f"{stem}_{mtime_ns}_{size}.parquet")
+    if os.path.exists(sidecar_path):
+        try:
+            return pd.read_parquet(sidecar_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable MMP reference cache {sidecar_path}: {str(e)}")
+
+    with pd.ExcelFile(mmp_ref_path, engine=_excel_read_engine()) as xl:
+        df = pd.read_excel(xl, converters={'% of Payments': float})
+
+    try:
+        _remove_stale_caches(ref_dir, stem)
+        tmp_path = sidecar_path + ".tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, sidecar_path)
+    except Exception as e:
+        # Caching is best-effort (e.g. pyarrow not installed or mixed-type columns)
+        logger.warning(f"Could not cache MMP reference as Parquet: {str(e)}")
+
+    return df
+
+
+def _partition_quantile(values, q):
+    """
+    Compute a quantile with O(N) selection instead of a full sort.
+
+    Uses linear interpolation and ignores NaNs, matching Series.quantile.
+
+    Args:
+        values (ndarray): Float values
+        q (float): Quantile between 0 and 1
+
+    Returns:
+        float: The quantile, or NaN when there are no values
+    """
+    import numpy as np
+
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n == 0:
+        return np.nan
+
+    pos = q * (n - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, n - 1)
+    selected = np.partition(values, [lo, hi])
+    return selected[lo] + (pos - lo) * (selected[hi] - selected[lo])
+
+
+def _col_width(series, col_name, sample=WIDTH_SAMPLE_SIZE):
+    """
+    Estimate an Excel column width for a Series.
+
+    Numeric columns are sized from their formatted extremes; other columns use
+    the longest string in a sample of at most `sample` rows.
+
+    Args:
+        series (Series): Column data
+        col_name (str): Column header
+        sample (int): Maximum number of rows to inspect
+
+    Returns:
+        int: Column width, including padding and capped at MAX_COLUMN_WIDTH
+    """
+    import pandas as pd
+
+    header_len = len(str(col_name))
+    if series.empty:
+        return header_len + 2
+
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        lo, hi = series.min(), series.max()
+        content_len = max(len(f"{lo:,.2f}"), len(f"{hi:,.2f}"))
+    else:
+        if len(series) > sample:
+            series = series.sample(sample, random_state=0)
+        if series.dtype.kind == 'M' and series.dt.tz is None and not pd.api.types.is_datetime64_dtype(series):
+            # Naive Arrow timestamps print with microseconds; measure them as NumPy datetimes do
+            series = series.astype(series.dtype.numpy_dtype)
+        content_len = series.astype(str).str.len().max()
+
+    return min(max(content_len, header_len) + 2, MAX_COLUMN_WIDTH)
+
+
+def _write_sheet(workbook, sheet_name, df, header_fmt, column_formats=None):
+    """
+    Write a DataFrame to a new worksheet, one row at a time.
+
+    Column widths and formats are set before any cell is written and rows are
+    written strictly in order, so the sheet can be streamed to disk when the
+    workbook uses xlsxwriter's constant_memory mode. Missing values are left blank.
+
+    Args:
+        workbook (Workbook): xlsxwriter workbook to add the sheet to
+        sheet_name (str): Name of the new worksheet
+        df (DataFrame): Data to write
+        header_fmt (Format): Format applied to the header row
+        column_formats (dict, optional): Column name to default cell Format
+
+    Returns:
+        Worksheet: The newly written worksheet
+    """
+    import pandas as pd
+
+    column_formats = dict(column_formats or {})
+    worksheet = workbook.add_worksheet(sheet_name)
+
+    # Convert datetime columns to Excel serial dates in one vectorized step so
+    # xlsxwriter does not convert every cell; the column format displays them
+    out_df = df
+    # Naive NumPy and Arrow timestamps; timezone-aware columns are left to xlsxwriter
+    date_cols = [
+        col for col in df.columns
+        if df[col].dtype.kind == 'M' and df[col].dt.tz is None
+    ]
+    if date_cols:
+        out_df = df.copy()
+        date_fmt = workbook.add_format({'num_format': EXCEL_DATE_FORMAT})
+        for col in date_cols:
+            out_df[col] = (df[col] - EXCEL_EPOCH) / timedelta(days=1)
+            column_formats.setdefault(col, date_fmt)
+
+    # Auto-adjust column widths based on content
+    for i, col in enumerate(df.columns):
+        worksheet.set_column(i, i, _col_width(df[col], col), column_formats.get(col))
+
+    worksheet.write_row(0, 0, list(df.columns.values), header_fmt)
+
+    values = out_df.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    for row_idx in range(values.shape[0]):
+        worksheet.write_row(row_idx + 1, 0, values[row_idx])
+
+    return worksheet
 
 
 class InvoiceProcessor:
@@ -56,7 +450,8 @@ class InvoiceProcessor:
     - Generating formatted reports
     """
 
-    def __init__(self, raw_data_dir, processed_root, mmp_ref_path):
+    def __init__(self, raw_data_dir, processed_root, mmp_ref_path, use_latest_marker=False,
+                 include_all_columns=False):
         """
         Initialize the processor with directory paths.
 
@@ -64,10 +459,20 @@ class InvoiceProcessor:
             raw_data_dir (str): Path to directory containing raw invoice files
             processed_root (str): Path to directory for processed output
             mmp_ref_path (str): Path to MMP reclass reference Excel file
+            use_latest_marker (bool): Reuse the raw file recorded by the previous run
+                while raw_data_dir's mtime is unchanged, skipping the directory scan.
+                Overwriting an existing export in place does not change the directory
+                mtime, so only enable this when new exports always arrive as new files.
+            include_all_columns (bool): Write every raw column to the "Full Data"
+                sheet instead of REPORT_COLUMNS (useful for debugging)
         """
+        from pathlib import Path
+
         self.raw_data_dir = raw_data_dir
         self.processed_root = processed_root
         self.mmp_ref_path = mmp_ref_path
+        self.use_latest_marker = use_latest_marker
+        self.include_all_columns = include_all_columns
 
         # Ensure directories exist
         Path(raw_data_dir).mkdir(exist_ok=True, parents=True)
@@ -82,6 +487,7 @@ class InvoiceProcessor:
         self.flags_df = None
         self.mmp_ref_df = None
         self.charts_total = None
+        self.raw_dir_mtime_ns = None
 
     def find_latest_invoice_file(self):
         """
@@ -94,21 +500,125 @@ class InvoiceProcessor:
             FileNotFoundError: If no Excel files exist in the directory
         """
         try:
-            excel_files = [f for f in os.listdir(self.raw_data_dir) if f.endswith('.xlsx')]
-            if not excel_files:
+            # Directory mtime changes whenever a file is added, removed or renamed
+            self.raw_dir_mtime_ns = os.stat(self.raw_data_dir).st_mtime_ns
+
+            latest_path = self._read_latest_marker() if self.use_latest_marker else None
+            if latest_path is not None:
+                self.latest_file = os.path.basename(latest_path)
+                logger.info(f"Found latest raw file: {self.latest_file} (unchanged since last run)")
+                return latest_path
+
+            # scandir reuses the stat data from directory enumeration where the OS provides it
+            with os.scandir(self.raw_data_dir) as entries:
+                latest = max(
+                    (e for e in entries if e.name.endswith('.xlsx') and e.is_file()),
+                    key=lambda e: e.stat().st_mtime,
+                    default=None
+                )
+            if latest is None:
                 raise FileNotFoundError(f"No Excel files found in {self.raw_data_dir}")
 
-            self.latest_file = max(
-                excel_files,
-                key=lambda f: os.path.getmtime(os.path.join(self.raw_data_dir, f))
-            )
-            latest_file_path = os.path.join(self.raw_data_dir, self.latest_file)
+            self.latest_file = latest.name
             logger.info(f"Found latest raw file: {self.latest_file}")
-            return latest_file_path
+            return latest.path
         except Exception as e:
             logger.error(f"Error finding latest file: {str(e)}")
             raise
 
+    def _read_latest_marker(self):
+        """
+        Look up the raw file recorded by the previous run.
+
+        The marker lives in processed_root so that writing it does not touch
+        raw_data_dir, and it is only trusted while the directory's mtime is unchanged.
+
+        Returns:
+            str: Path to the recorded raw file, or None if the marker is missing or stale
+        """
+        marker_path = os.path.join(self.processed_root, LATEST_MARKER_NAME)
+        try:
+            with open(marker_path, encoding='utf-8') as f:
+                marker = json.load(f)
+            if marker['raw_dir_mtime_ns'] != self.raw_dir_mtime_ns:
+                return None
+            latest_path = os.path.join(self.raw_data_dir, marker['latest_file'])
+            return latest_path if os.path.isfile(latest_path) else None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_latest_marker(self):
+        """Record the processed raw file so the next run can skip the directory scan."""
+        marker_path = os.path.join(self.processed_root, LATEST_MARKER_NAME)
+        try:
+            _write_json_atomic(marker_path, {
+                'latest_file': self.latest_file,
+                'raw_dir_mtime_ns': self.raw_dir_mtime_ns
+            })
+        except OSError as e:
+            logger.warning(f"Could not record latest raw file: {str(e)}")
+
+    def _run_key(self, file_path):
+        """
+        Build the key identifying this run's inputs.
+
+        Args:
+            file_path (str): Path to the invoice Excel file
+
+        Returns:
+            dict: Raw file name, mtime and size, plus the MMP reference mtime and output options
+        """
+        stat = os.stat(file_path)
+        try:
+            mmp_ref_mtime_ns = os.stat(self.mmp_ref_path).st_mtime_ns
+        except OSError:
+            mmp_ref_mtime_ns = None
+
+        return {
+            'latest_file': self.latest_file,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'mmp_ref_mtime_ns': mmp_ref_mtime_ns,
+            'include_all_columns': self.include_all_columns
+        }
+
+    def _cached_report_paths(self, run_key):
+        """
+        Look up the reports of a previous run with identical inputs.
+
+        Args:
+            run_key (dict): Key from _run_key
+
+        Returns:
+            tuple: Paths to the existing report files, or None if the inputs
+            changed or an output file is missing
+        """
+        state_path = os.path.join(self.processed_root, RUN_STATE_NAME)
+        try:
+            with open(state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            if state['key'] != run_key:
+                return None
+            report_paths = tuple(state['report_paths'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        return report_paths if all(os.path.isfile(path) for path in report_paths) else None
+
+    def _write_run_state(self, run_key, report_paths):
+        """
+        Record the inputs and outputs of a successful run.
+
+        Args:
+            run_key (dict): Key from _run_key
+            report_paths (tuple): Paths to the generated report files
+        """
+        state_path = os.path.join(self.processed_root, RUN_STATE_NAME)
+        try:
+            _write_json_atomic(state_path, {'key': run_key, 'report_paths': list(report_paths)})
+        except OSError as e:
+            logger.warning(f"Could not record run state: {str(e)}")
+
     def load_invoice_data(self, file_path):
         """
         Load and clean invoice data from Excel file.
@@ -119,9 +629,10 @@ class InvoiceProcessor:
         Raises:
             Exception: If file cannot be read or processed
         """
+        import pandas as pd
+
         try:
-            # Skip the first row which contains header information
-            self.invoice_df = pd.read_excel(file_path, skiprows=1)
+            self.invoice_df = self._read_invoice_file(file_path)
 
             # Extract date information from the first journal entry
             self.report_date = pd.to_datetime(self.invoice_df['Journal Date'].iloc[0])
@@ -136,13 +647,91 @@ class InvoiceProcessor:
             logger.error(f"Error reading invoice data: {str(e)}")
             raise
 
+    def _read_invoice_file(self, file_path):
+        """
+        Read the raw invoice Excel file, reusing a Parquet cache when the file is unchanged.
+
+        Only the columns needed for processing and the report are read, unless
+        include_all_columns is set. The cache is keyed on the source file's
+        modification time and size, so a re-exported file is always decoded again.
+
+        Args:
+            file_path (str): Path to the invoice Excel file
+
+        Returns:
+            DataFrame: The raw invoice data
+        """
+        from pathlib import Path
+        import pandas as pd
+
+        stat = os.stat(file_path)
+        cache_dir = os.path.join(self.processed_root, CACHE_DIR_NAME)
+        stem = Path(file_path).stem
+        variant = "_all" if self.include_all_columns else ""
+        cache_path = os.path.join(cache_dir, f"{stem}_{stat.st_mtime_ns}_{stat.st_size}{variant}.parquet")
+
+        if os.path.exists(cache_path):
+            try:
+                # astype is a no-op for caches that already carry INVOICE_DTYPES
+                df = pd.read_parquet(cache_path).astype(INVOICE_DTYPES)
+                logger.info(f"Loaded cached invoice data: {cache_path}")
+                return df
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable invoice cache {cache_path}: {str(e)}")
+
+        # Skip the first row which contains header information
+        if self.include_all_columns:
+            usecols = None
+        else:
+            wanted = set(PROCESSING_COLUMNS) | set(REPORT_COLUMNS)
+            usecols = lambda col: col in wanted  # noqa: E731 - tolerates absent optional columns
+        if _use_arrow_backend():
+            # The Arrow backend rejects mixed cells (e.g. invoice numbers 1001 and 'A5')
+            # in declared columns, so INVOICE_DTYPES are applied after the read
+            read_options = {'dtype_backend': 'pyarrow'}
+        else:
+            read_options = {'dtype': INVOICE_DTYPES}
+        with pd.ExcelFile(file_path, engine=_excel_read_engine()) as xl:
+            df = pd.read_excel(
+                xl,
+                skiprows=1,
+                usecols=usecols,
+                parse_dates=['Journal Date'],
+                **read_options
+            )
+        if 'dtype' not in read_options:
+            df = df.astype(INVOICE_DTYPES)
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            _remove_stale_caches(cache_dir, stem)
+            tmp_path = cache_path + ".tmp"
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            # Caching is best-effort (e.g. pyarrow not installed or mixed-type columns)
+            logger.warning(f"Could not cache invoice data as Parquet: {str(e)}")
+
+        return df
+
     def _filter_invoice_data(self):
         """Apply initial filtering to the invoice data."""
-        # Filter for required contracts
-        self.invoice_df = self.invoice_df[self.invoice_df['Contract'].isin(REQUIRED_CONTRACTS)]
+        import pandas as pd
+
+        # Non-numeric contracts become NaN here and are dropped by the filter
+        contract = pd.to_numeric(self.invoice_df['Contract'], errors='coerce')
+
+        # Keep required contracts and exclude specific line descriptions in one slice
+        mask = (
+            contract.isin(REQUIRED_CONTRACTS)
+            & ~self.invoice_df['Line Descr'].isin(EXCLUDED_LINE_DESCRIPTIONS)
+        )
+        self.invoice_df = self.invoice_df.loc[mask].reset_index(drop=True)
 
-        # Exclude specific line descriptions
-        self.invoice_df = self.invoice_df[~self.invoice_df['Line Descr'].isin(EXCLUDED_LINE_DESCRIPTIONS)]
+        # Only the required contracts remain, so Contract fits the narrowest integer dtype
+        self.invoice_df['Contract'] = pd.to_numeric(
+            contract[mask].to_numpy(dtype='int64'), downcast='integer'
+        )
 
         logger.info(f"After filtering: {len(self.invoice_df)} invoice records")
 
@@ -150,76 +739,144 @@ class InvoiceProcessor:
         """
         Categorize invoices based on business rules and add labels.
         """
-        label_conditions = {
-            lambda row: row['Source'] == 'AP2' and row['Contract'] == 1111: "Charts & Coding",
-            lambda row: row['Source'] == 'AP2' and row['Contract'] == 2222: "Misc. exp.",
-            lambda row: row['Source'] == 'COR' and row['Contract'] == 1111 and row['Amount'] < 0: "1111 Coupa Reversal",
-            lambda row: row['Source'] == 'COR' and row['Contract'] == 1111 and row['Amount'] > 0: "1111 Coupa Pending",
-            lambda row: row['Source'] == 'COR' and row['Contract'] == 2222 and row['Amount'] < 0: "2222 Coupa Reversal",
-            lambda row: row['Source'] == 'COR' and row['Contract'] == 2222 and row['Amount'] > 0: "2222 Coupa Pending"
-        }
+        import numpy as np
 
-        def label_invoice(row):
-            """Determine the appropriate label for an invoice row."""
-            for condition, label in label_conditions.items():
-                if condition(row):
-                    return label
-            return "Unlabeled"
+        # Shared by the label rules and the Value Used selection
+        src_idx = self._source_index()
+        is_cor = src_idx == SOURCE_COR
 
-        self.invoice_df['Label'] = self.invoice_df.apply(label_invoice, axis=1)
+        kernel = _get_label_kernel() if len(self.invoice_df) >= NUMBA_LABEL_MIN_ROWS else None
+        if kernel is not None:
+            self.invoice_df['Label'] = self._label_with_kernel(kernel, src_idx)
+        else:
+            self.invoice_df['Label'] = self._label_with_lookup(src_idx)
 
         # Use AP Amount for AP2 records, Amount for COR records
-        self.invoice_df['Value Used'] = self.invoice_df['Amount'].where(
-            self.invoice_df['Source'] == 'COR',
-            self.invoice_df['AP Amount']
+        self.invoice_df['Value Used'] = np.where(
+            is_cor,
+            self.invoice_df['Amount'].to_numpy(dtype=np.float64, na_value=np.nan),
+            self.invoice_df['AP Amount'].to_numpy(dtype=np.float64, na_value=np.nan)
         )
 
         # Log the counts of each category
-        category_counts = self.invoice_df['Label'].value_counts().sort_index()
+        category_counts = self.invoice_df['Label'].value_counts(sort=False)
+        category_counts = category_counts[category_counts > 0]
         logger.info("\n" + "-" * 50)
         logger.info(f"{Colors.BLUE}INVOICE CATEGORIES SUMMARY:{Colors.END}")
         logger.info("-" * 50)
         logger.info(f"{Colors.YELLOW}{'Category':<25s} {'Count':>10s}{Colors.END}")
         logger.info("-" * 50)
-        for category, count in category_counts.items():
-            logger.info(f"{category:<25s} {count:>10d}")
+        if not category_counts.empty:
+            count_lines = [f"{category:<25s} {count:>10d}" for category, count in category_counts.items()]
+            logger.info("\n" + "\n".join(count_lines))
         logger.info("-" * 50)
 
+    def _source_index(self):
+        """
+        Map each invoice's Source to a SOURCE_* index through its category codes.
+
+        Returns:
+            ndarray: int8 SOURCE_AP2, SOURCE_COR or SOURCE_OTHER for each row
+        """
+        import numpy as np
+
+        source = self.invoice_df['Source'].cat
+        # One slot per category plus a trailing slot, which code -1 (blank) indexes
+        lookup = np.full(len(source.categories) + 1, SOURCE_OTHER, dtype=np.int8)
+        for name, idx in (('AP2', SOURCE_AP2), ('COR', SOURCE_COR)):
+            pos = source.categories.get_indexer([name])[0]
+            if pos >= 0:
+                lookup[pos] = idx
+        return lookup[source.codes.to_numpy()]
+
+    def _label_with_lookup(self, src_idx):
+        """
+        Label invoices by encoding each row as an integer key into _label_code_table.
+
+        Args:
+            src_idx (ndarray): SOURCE_* index for each row
+
+        Returns:
+            Categorical: Label for each invoice row
+        """
+        import numpy as np
+        import pandas as pd
+
+        con = self.invoice_df['Contract'].to_numpy(dtype=np.int64)
+        con_idx = np.where(con == 1111, 0, np.where(con == 2222, 1, 2))
+        amt = self.invoice_df['Amount'].to_numpy(dtype=np.float64, na_value=np.nan)
+        sign_idx = 1 + (amt > 0).astype(np.int8) - (amt < 0)
+
+        key = (src_idx * 3 + con_idx) * 3 + sign_idx
+        return pd.Categorical.from_codes(_label_code_table()[key], categories=LABEL_CATEGORIES)
+
+    def _label_with_kernel(self, kernel, src_idx):
+        """
+        Label invoices with the Numba kernel, avoiding per-rule temporary arrays.
+
+        Args:
+            kernel (function): Compiled kernel from _get_label_kernel
+            src_idx (ndarray): SOURCE_* index for each row
+
+        Returns:
+            Categorical: Label for each invoice row
+        """
+        import numpy as np
+        import pandas as pd
+
+        # Filtering guarantees every remaining contract is a required (integer) contract
+        con = self.invoice_df['Contract'].to_numpy(dtype=np.int64)
+        amt = self.invoice_df['Amount'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        codes = np.empty(len(self.invoice_df), dtype=np.int8)
+        kernel(src_idx, con, amt, codes)
+        return pd.Categorical.from_codes(codes, categories=LABEL_CATEGORIES)
+
     def create_summary(self):
         """
         Create a summary dataframe with totals by label.
         """
-        self.summary_df = self.invoice_df.groupby('Label')['Value Used'].sum().reset_index()
-        self.summary_df.columns = ['Label', 'Total']
+        self.summary_df = (
+            self.invoice_df.groupby('Label', observed=True)
+            .agg(Total=('Value Used', 'sum'))
+            .reset_index()
+        )
+        # Plain strings so rows such as "Total MMP Reclass" can be appended later
+        self.summary_df['Label'] = self.summary_df['Label'].astype(str)
 
         # Format the summary for logging
         logger.info("\n" + "-" * 50)
         logger.info(f"{Colors.PINK}SUMMARY TOTALS BY CATEGORY:{Colors.END}")
         logger.info("-" * 50)
-        for _, row in self.summary_df.iterrows():
-            logger.info(f"{row['Label']:.<30s} {Colors.GREEN}${row['Total']:>15,.2f}{Colors.END}")
+        if not self.summary_df.empty:
+            label_col = self.summary_df['Label'].astype(str).str.ljust(30, '.')
+            total_col = self.summary_df['Total'].map(lambda v: f"{Colors.GREEN}${v:>15,.2f}{Colors.END}")
+            logger.info("\n" + "\n".join(label_col + " " + total_col))
         logger.info("-" * 50)
 
     def identify_flags(self):
         """
         Identify potential issues in the data - duplicates and outliers.
         """
+        import numpy as np
+
         # Identify duplicates
-        duplicates = self.invoice_df[self.invoice_df.duplicated(subset=['Invoice'], keep=False)]
+        dup_mask = self.invoice_df['Invoice'].duplicated(keep=False).to_numpy()
 
         # Identify outliers - values above the 99th percentile
-        abs_value_threshold = self.invoice_df['Value Used'].abs().quantile(OUTLIER_PERCENTILE)
-        outliers = self.invoice_df[self.invoice_df['Value Used'].abs() > abs_value_threshold]
+        abs_vals = np.abs(self.invoice_df['Value Used'].to_numpy(dtype=float))
+        abs_value_threshold = _partition_quantile(abs_vals, OUTLIER_PERCENTILE)
+        outlier_mask = abs_vals > abs_value_threshold
 
-        # Combine flagged items
-        self.flags_df = pd.concat([duplicates, outliers]).drop_duplicates()
+        # Combine flagged items in a single pass over the frame
+        self.flags_df = self.invoice_df.loc[dup_mask | outlier_mask]
 
         # Format the flags summary
         logger.info("\n" + "-" * 50)
         logger.info(f"{Colors.YELLOW}FLAGGED ITEMS SUMMARY:{Colors.END}")
         logger.info("-" * 50)
-        logger.info(f"Duplicate invoices: {Colors.PURPLE}{len(duplicates)}{Colors.END}")
-        logger.info(f"Outliers (>${abs_value_threshold:,.2f}): {Colors.PURPLE}{len(outliers)}{Colors.END}")
+        logger.info(f"Duplicate invoices: {Colors.PURPLE}{dup_mask.sum()}{Colors.END}")
+        logger.info(f"Outliers (>${abs_value_threshold:,.2f}): {Colors.PURPLE}{outlier_mask.sum()}{Colors.END}")
         logger.info(f"Total flagged items: {Colors.PURPLE}{len(self.flags_df)}{Colors.END}")
         logger.info("-" * 50)
 
@@ -231,6 +888,8 @@ class InvoiceProcessor:
             FileNotFoundError: If MMP reference file is not found
             Exception: For other processing errors
         """
+        import pandas as pd
+
         logger.info("\n" + "-" * 50)
         logger.info(f"{Colors.CYAN}PROCESSING MMP RECLASS ALLOCATION:{Colors.END}")
         logger.info("-" * 50)
@@ -241,18 +900,22 @@ class InvoiceProcessor:
                 logger.warning(f"{Colors.YELLOW}No data available for MMP allocation - summary is empty{Colors.END}")
                 return
 
+            # Labels are unique after grouping, so look totals up by label
+            summary_by_label = self.summary_df.set_index('Label')['Total']
+
             # Check if "Charts & Coding" category exists
-            if "Charts & Coding" not in self.summary_df["Label"].values:
+            if "Charts & Coding" not in summary_by_label.index:
                 logger.warning(f"{Colors.YELLOW}No \"Charts & Coding\" category found in summary{Colors.END}")
                 return
 
             # Load the MMP reference data
-            self.mmp_ref_df = pd.read_excel(self.mmp_ref_path, converters={'% of Payments': float})
+            ref_stat = os.stat(self.mmp_ref_path)
+            self.mmp_ref_df = _load_mmp_reference(
+                self.mmp_ref_path, ref_stat.st_mtime_ns, ref_stat.st_size
+            ).copy()
 
             # Get the total for "Charts & Coding" category
-            self.charts_total = self.summary_df.loc[
-                self.summary_df['Label'] == 'Charts & Coding', 'Total'
-            ].values[0]
+            self.charts_total = summary_by_label.at['Charts & Coding']
 
             # Calculate payment allocations based on percentages
             self.mmp_ref_df['Payment Allocation'] = self.mmp_ref_df['% of Payments'] * self.charts_total
@@ -260,10 +923,11 @@ class InvoiceProcessor:
             # Get subset allocation
             subset_alloc = self.mmp_ref_df.loc[
                 self.mmp_ref_df['Contract'] == 'Subset', 'Payment Allocation'
-            ].values[0]
+            ].iat[0]
 
-            # Add to summary
-            self.summary_df.loc[len(self.summary_df.index)] = ['Total MMP Reclass', subset_alloc]
+            # Add to summary with a single concat rather than enlarging in place
+            reclass_row = pd.DataFrame([{'Label': 'Total MMP Reclass', 'Total': subset_alloc}])
+            self.summary_df = pd.concat([self.summary_df, reclass_row], ignore_index=True)
 
             # Calculate adjusted allocation
             total_alloc = self.mmp_ref_df.loc[
@@ -289,13 +953,6 @@ class InvoiceProcessor:
             logger.error(f"{Colors.YELLOW}Error processing MMP allocation: {str(e)}{Colors.END}")
             raise
 
-        except FileNotFoundError:
-            logger.error(f"MMP Reclass reference not found at: {self.mmp_ref_path}")
-            raise
-        except Exception as e:
-            logger.error(f"Error processing MMP allocation: {str(e)}")
-            raise
-
     def save_reports(self):
         """
         Save processed data to Excel files with formatting.
@@ -314,11 +971,13 @@ class InvoiceProcessor:
         report_path = os.path.join(processed_month_dir, report_filename)
         mmp_output_path = os.path.join(processed_month_dir, mmp_output_filename)
 
-        # Save MMP Allocation file
-        self._save_mmp_allocation_file(mmp_output_path)
-
-        # Save main report file
-        self._save_main_report_file(report_path)
+        # The two workbooks share no state, so write them concurrently;
+        # xlsxwriter releases the GIL while compressing each file
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            mmp_future = executor.submit(self._save_mmp_allocation_file, mmp_output_path)
+            report_future = executor.submit(self._save_main_report_file, report_path)
+            mmp_future.result()
+            report_future.result()
 
         return report_path, mmp_output_path
 
@@ -329,6 +988,9 @@ class InvoiceProcessor:
         Args:
             file_path (str): Output file path
         """
+        import pandas as pd
+        from xlsxwriter.utility import xl_col_to_name
+
         try:
             with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
                 self.mmp_ref_df.to_excel(writer, sheet_name="MMP Allocation", index=False)
@@ -336,64 +998,35 @@ class InvoiceProcessor:
                 worksheet = writer.sheets["MMP Allocation"]
 
                 # Define formats
-                header_fmt = workbook.add_format({
-                    'bold': True,
-                    'fg_color': '#E6E6FA',  # Pastel lavender
-                    'align': 'center',
-                    'border': 1
-                })
-                percent_fmt = workbook.add_format({'num_format': '0.00%', 'align': 'center'})
-                currency_fmt = workbook.add_format({'num_format': '$#,##0', 'align': 'right'})
-                gray_fmt = workbook.add_format({
-                    'num_format': '$#,##0',
-                    'align': 'right',
-                    'bg_color': '#D9D9D9'
-                })
-                gray_pct_fmt = workbook.add_format({
-                    'num_format': '0.00%',
-                    'align': 'center',
-                    'bg_color': '#D9D9D9'
-                })
-                yellow_fmt = workbook.add_format({
-                    'num_format': '$#,##0',
-                    'align': 'right',
-                    'bg_color': '#FFFACD'  # Pastel yellow
-                })
-                yellow_pct_fmt = workbook.add_format({
-                    'num_format': '0.00%',
-                    'align': 'center',
-                    'bg_color': '#FFFACD'  # Pastel yellow
-                })
+                formats = {name: workbook.add_format(spec) for name, spec in MMP_FORMAT_SPECS.items()}
 
                 # Apply header format
-                for col_num, value in enumerate(self.mmp_ref_df.columns.values):
-                    worksheet.write(0, col_num, value, header_fmt)
+                worksheet.write_row(0, 0, list(self.mmp_ref_df.columns.values), formats['header'])
 
                 # Auto-adjust column widths based on content
                 for i, col in enumerate(self.mmp_ref_df.columns):
-                    # Find the maximum length in the column
-                    max_len = max(
-                        self.mmp_ref_df[col].astype(str).map(len).max(),
-                        len(str(col))
-                    )
-                    # Add a little extra space
-                    worksheet.set_column(i, i, max_len + 2)
+                    worksheet.set_column(i, i, _col_width(self.mmp_ref_df[col], col))
 
                 # Get column indexes
                 percent_col = self.mmp_ref_df.columns.get_loc('% of Payments')
                 alloc_col = self.mmp_ref_df.columns.get_loc('Payment Allocation')
 
-                worksheet.set_column(percent_col, percent_col, None, percent_fmt)
-                worksheet.set_column(alloc_col, alloc_col, None, currency_fmt)
-
-                # Apply conditional formatting
-                for row_idx, row in self.mmp_ref_df.iterrows():
-                    if str(row['State']).strip().lower() == 'total':
-                        worksheet.write(row_idx + 1, alloc_col, row['Payment Allocation'], gray_fmt)
-                        worksheet.write(row_idx + 1, percent_col, row['% of Payments'], gray_pct_fmt)
-                    if str(row['Contract']).strip().lower() == 'subset':
-                        worksheet.write(row_idx + 1, alloc_col, row['Payment Allocation'], yellow_fmt)
-                        worksheet.write(row_idx + 1, percent_col, row['% of Payments'], yellow_pct_fmt)
+                worksheet.set_column(percent_col, percent_col, None, formats['percent'])
+                worksheet.set_column(alloc_col, alloc_col, None, formats['currency'])
+
+                # Highlight Total and subset rows with conditional formats evaluated by
+                # Excel. Earlier rules take priority, so subset wins as it did before.
+                state_ref = f"${xl_col_to_name(self.mmp_ref_df.columns.get_loc('State'))}2"
+                contract_ref = f"${xl_col_to_name(self.mmp_ref_df.columns.get_loc('Contract'))}2"
+                last_row = len(self.mmp_ref_df)
+                for ref, value, fmt in ((contract_ref, 'subset', formats['yellow']),
+                                        (state_ref, 'total', formats['gray'])):
+                    for col in (alloc_col, percent_col):
+                        worksheet.conditional_format(1, col, last_row, col, {
+                            'type': 'formula',
+                            'criteria': f'=LOWER(TRIM({ref}))="{value}"',
+                            'format': fmt
+                        })
 
             logger.info(f"Saved MMP allocation file: {file_path}")
         except Exception as e:
@@ -407,105 +1040,60 @@ class InvoiceProcessor:
         Args:
             file_path (str): Output file path
         """
+        import pandas as pd
+
         try:
-            with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
+            # constant_memory flushes each row as it is written, so every sheet
+            # must be written row by row, in order, with no revisits
+            writer_options = {
+                'constant_memory': True,
+                'default_date_format': EXCEL_DATE_FORMAT
+            }
+            with pd.ExcelWriter(
+                file_path, engine='xlsxwriter', engine_kwargs={'options': writer_options}
+            ) as writer:
                 workbook = writer.book
 
                 # Define formats
-                header_fmt = workbook.add_format({
-                    'bold': True,
-                    'align': 'center',
-                    'border': 1
-                })
-                summary_header_fmt = workbook.add_format({
-                    'bold': True,
-                    'fg_color': '#FFD1DC',  # Pastel pink
-                    'align': 'center',
-                    'border': 1
-                })
-                data_header_fmt = workbook.add_format({
-                    'bold': True,
-                    'fg_color': '#CCFFCC',  # Pastel green
-                    'align': 'center',
-                    'border': 1
-                })
-                flags_header_fmt = workbook.add_format({
-                    'bold': True,
-                    'fg_color': '#FFFFCC',  # Pastel yellow
-                    'align': 'center',
-                    'border': 1
-                })
-                currency_fmt = workbook.add_format({'num_format': '$#,##0.00'})
-
-                # Summary sheet
-                self.summary_df.to_excel(writer, sheet_name="Summary", index=False)
-                summary_ws = writer.sheets["Summary"]
-
-                # Apply header format to Summary sheet
-                for col_num, value in enumerate(self.summary_df.columns.values):
-                    summary_ws.write(0, col_num, value, summary_header_fmt)
-
-                # Auto-adjust column widths for Summary sheet
-                for i, col in enumerate(self.summary_df.columns):
-                    # Find the maximum length in the column
-                    max_len = max(
-                        self.summary_df[col].astype(str).map(len).max(),
-                        len(str(col))
-                    )
-                    # Add a little extra space
-                    summary_ws.set_column(i, i, max_len + 2)
-
-                # Format currency in summary
-                total_col_idx = self.summary_df.columns.get_loc('Total')
-                summary_ws.set_column(total_col_idx, total_col_idx, None, currency_fmt)
+                formats = {name: workbook.add_format(spec) for name, spec in REPORT_FORMAT_SPECS.items()}
+
+                # Summary sheet, with currency formatting on the totals
+                _write_sheet(
+                    workbook, "Summary", self.summary_df, formats['summary_header'],
+                    column_formats={'Total': formats['currency']}
+                )
 
                 # Full data sheet
-                self.invoice_df.to_excel(writer, sheet_name="Full Data", index=False)
-                data_ws = writer.sheets["Full Data"]
-
-                # Apply header format to Full Data sheet
-                for col_num, value in enumerate(self.invoice_df.columns.values):
-                    data_ws.write(0, col_num, value, data_header_fmt)
-
-                # Auto-adjust column widths for Full Data sheet
-                for i, col in enumerate(self.invoice_df.columns):
-                    # For large datasets, use a sample to determine width
-                    column_data = self.invoice_df[col].astype(str)
-                    # Consider only a sample of the data to avoid slow performance on large datasets
-                    if len(column_data) > 100:
-                        sample = column_data.sample(100).map(len)
-                        max_len = max(sample.max(), len(str(col)))
-                    else:
-                        max_len = max(column_data.map(len).max(), len(str(col)))
-                    # Set a reasonable limit to column width
-                    col_width = min(max_len + 2, 50)  # Limit to 50 characters
-                    data_ws.set_column(i, i, col_width)
+                _write_sheet(workbook, "Full Data", self._full_data_frame(), formats['data_header'])
 
                 # Flags sheet
-                self.flags_df.to_excel(writer, sheet_name="Flags", index=False)
-                flags_ws = writer.sheets["Flags"]
-
-                # Apply header format to Flags sheet
-                for col_num, value in enumerate(self.flags_df.columns.values):
-                    flags_ws.write(0, col_num, value, flags_header_fmt)
-
-                # Auto-adjust column widths for Flags sheet
-                for i, col in enumerate(self.flags_df.columns):
-                    if not self.flags_df.empty:
-                        max_len = max(
-                            self.flags_df[col].astype(str).map(len).max(),
-                            len(str(col))
-                        )
-                        col_width = min(max_len + 2, 50)  # Limit to 50 characters
-                    else:
-                        col_width = len(str(col)) + 2
-                    flags_ws.set_column(i, i, col_width)
+                _write_sheet(workbook, "Flags", self.flags_df, formats['flags_header'])
 
             logger.info(f"Saved main report file: {file_path}")
         except Exception as e:
             logger.error(f"Error saving main report file: {str(e)}")
             raise
 
+    def _full_data_frame(self):
+        """
+        Select the columns written to the "Full Data" sheet.
+
+        Returns:
+            DataFrame: The report columns present in the data, in export order,
+            with integer columns downcast to the smallest dtype that holds them
+        """
+        import pandas as pd
+
+        if self.include_all_columns:
+            return self.invoice_df
+
+        out_df = self.invoice_df[[col for col in self.invoice_df.columns if col in REPORT_COLUMNS]].copy()
+        # Floats are left alone: currency amounts must keep float64 precision
+        for col in out_df.columns:
+            if pd.api.types.is_integer_dtype(out_df[col]):
+                out_df[col] = pd.to_numeric(out_df[col], downcast='integer')
+        return out_df
+
     def process(self):
         """
         Run the complete processing pipeline.
@@ -516,6 +1104,14 @@ class InvoiceProcessor:
         try:
             # Step 1: Find and load the latest invoice file
             latest_file_path = self.find_latest_invoice_file()
+
+            # Skip the whole pipeline when nothing changed since the last successful run
+            run_key = self._run_key(latest_file_path)
+            cached_paths = self._cached_report_paths(run_key)
+            if cached_paths is not None:
+                logger.info("Inputs unchanged since last run; skipping processing")
+                return cached_paths
+
             self.load_invoice_data(latest_file_path)
 
             # Check if we have data to process
@@ -531,6 +1127,9 @@ class InvoiceProcessor:
 
             # Step 3: Save the reports
             report_paths = self.save_reports()
+            if self.use_latest_marker:
+                self._write_latest_marker()
+            self._write_run_state(run_key, report_paths)
 
             logger.info("Invoice processing completed successfully")
             return report_paths